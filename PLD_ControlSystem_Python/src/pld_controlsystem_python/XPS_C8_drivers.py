@@ -126,6 +126,12 @@ class XPS:
         if (XPS.__usedSockets[socketId] == 1):
             XPS.__sockets[socketId].settimeout(timeOut)
 
+    # TCP_SetNoDelay : disable Nagle so short command/reply exchanges are not delayed
+    def TCP_SetNoDelay (self, socketId, flag=True):
+        if (XPS.__usedSockets.get(socketId) == 1):
+            sock = XPS.__sockets[socketId]
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(flag))
+
     # TCP_CloseSocket
     def TCP_CloseSocket (self, socketId):
         if (socketId >= 0 and socketId < self.MAX_NB_SOCKETS):
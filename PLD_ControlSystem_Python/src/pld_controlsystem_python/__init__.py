@@ -1,6 +1,20 @@
+import importlib
 import sys
-from .newportxps import NewportXPS
-from .attenuator_ctrl import AttenuatorControls
+
+# Public classes are imported on first access so that importing a single
+# driver module does not pull in numpy/paramiko through newportxps.
+_LAZY_IMPORTS = {
+    "NewportXPS": ".newportxps",
+    "AttenuatorControls": ".attenuator_ctrl",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if sys.version_info[:2] >= (3, 8):
     # TODO: Import directly (no need for conditional) when `python_requires = >= 3.8`
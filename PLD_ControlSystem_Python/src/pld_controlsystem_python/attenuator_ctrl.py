@@ -1,7 +1,22 @@
-import serial
-import time
+import functools
 
-class AttenuatorControls:
+from pld_controlsystem_python.serial_ctrl import SerialControls
+
+# Fixed commands never change, so keep them pre-encoded
+_CMDS = {
+    'clear': b'f\n',
+    'block': b'g\n',
+    'home': b'o\n',
+}
+
+
+@functools.lru_cache(maxsize=512)
+def _angle_cmd(angle_int):
+    """Return the encoded rotate command for an integer angle."""
+    return b',%d\n' % angle_int
+
+
+class AttenuatorControls(SerialControls):
     """
     A class to control the laser attenuator via an ATmega328p microcontroller.
     A pythonized version of preexisting Labview Attenuator VI code.
@@ -15,18 +30,7 @@ class AttenuatorControls:
         :param baudrate: The baud rate for the serial communication.
         :param timeout: The timeout for the serial communication.
         """
-        self.ser = serial.Serial(port, baudrate, timeout=timeout)
-
-    def send_command(self, command):
-        """
-        Send a command to the microcontroller and read the response.
-
-        :param command: The command string to send.
-        """
-        self.ser.write(command.encode())
-        # response = self.ser.readline().decode()
-        # print("Response:", response)
-        time.sleep(0.01)  # Slight delay to ensure command is processed
+        super().__init__(port, baudrate, timeout=timeout)
 
     def rotate_to_angle(self, angle):
         """
@@ -35,31 +39,27 @@ class AttenuatorControls:
         :param angle: The angle to rotate to.
         """
         #Convert possible float angle to nearest integer angle 
-        angle_int = round(angle)        
+        angle_int = round(angle)
 
-        command = f',{angle_int}\n'
-        self.send_command(command)
+        self.send_command(_angle_cmd(angle_int))
 
     def clear_laser(self):
         """
         Clear the laser.
         """
-        command = 'f\n'
-        self.send_command(command)
+        self.send_command(_CMDS['clear'])
 
     def block_laser(self):
         """
         Block the laser.
         """
-        command = 'g\n'
-        self.send_command(command)
+        self.send_command(_CMDS['block'])
 
     def home_attenuator(self):
         """
         Home the attenuator.
         """
-        command = 'o\n'
-        self.send_command(command)
+        self.send_command(_CMDS['home'])
 
     def set_rotation_speed(self, speed):
         """
@@ -72,14 +72,7 @@ class AttenuatorControls:
         """
         # Convert possible float speed to nearest integer speed
         speed_int = round(speed)
-        command = f'#{speed_int}\n'
-        self.send_command(command)
-
-    def close(self):
-        """
-        Close the serial connection.
-        """
-        self.ser.close()
+        self.send_command(b'#%d\n' % speed_int)
 
 def main():
     # Create an instance of the AttenuatorControls class
@@ -1,29 +1,109 @@
 # This code utilizes the `NewportXPS` from `newportxps` by `pyepics`.
 # Source: https://github.com/pyepics/newportxps
 
-from PLD_ControlSystem_Python.src.pld_controlsystem_python.newportxps import NewportXPS
-from PLD_ControlSystem_Python.src.pld_controlsystem_python.XPS_C8_drivers import XPSException
+import functools
+import logging
+import time
 
+from pld_controlsystem_python.newportxps import NewportXPS
+from pld_controlsystem_python.serial_ctrl import AsyncMixin
+from pld_controlsystem_python.XPS_C8_drivers import XPSException
 
-class MotionController(NewportXPS):
+logger = logging.getLogger(__name__)
+
+
+def _clears_cache(method):
+    """Wrap an inherited NewportXPS method that moves stages (or changes their
+    motion parameters) so the cached positions, velocities and status report
+    are dropped once it returns, or fails part-way through a move."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.clear_cache()
+    return wrapper
+
+
+class MotionController(AsyncMixin, NewportXPS):
     """A class representing a motion controller.
 
     Args:
         NewportXPS (type): The base class for the motion controller.
     """
+    # Seconds a status report is reused by show_status before it is re-fetched
+    status_max_age = 0.5
+    # Absolute moves closer than this to the cached position are skipped
+    position_epsilon = 1e-4
+
+    # Every inherited call that can move a stage invalidates the caches
+    move_stage = _clears_cache(NewportXPS.move_stage)
+    move_group = _clears_cache(NewportXPS.move_group)
+    abort_group = _clears_cache(NewportXPS.abort_group)
+    kill_group = _clears_cache(NewportXPS.kill_group)
+    initialize_group = _clears_cache(NewportXPS.initialize_group)
+    initialize_allgroups = _clears_cache(NewportXPS.initialize_allgroups)
+    home_group = _clears_cache(NewportXPS.home_group)
+    home_allgroups = _clears_cache(NewportXPS.home_allgroups)
+    set_velocity_parameters = _clears_cache(NewportXPS.set_velocity_parameters)
+    execute_script = _clears_cache(NewportXPS.execute_script)
+    run_trajectory = _clears_cache(NewportXPS.run_trajectory)
+    run_line_trajectory_general = _clears_cache(NewportXPS.run_line_trajectory_general)
+    reboot = _clears_cache(NewportXPS.reboot)
+
     def __init__(self, host, group=None, username='Administrator', password='Administrator',
-                port=5001, timeout=10, extra_triggers=0, outputs=('CurrentPosition', 'SetpointPosition')):
+                port=5001, timeout=10, extra_triggers=0, outputs=('CurrentPosition', 'SetpointPosition'),
+                tcp_nodelay=True):
+        # Note that the following attributes are not part of the NewportXPS class
+        # Set before super().__init__(), which connects and so calls self.connect()
+        self.tcp_nodelay = tcp_nodelay
+        # Last known position/velocity per stage, to skip redundant TCP round-trips
+        self._pos_cache = {}
+        self._vel_cache = {}
+        self._status_cache = None
+        self._status_ts = 0.0
         super().__init__(host, group=group, username=username, password=password,
                         port=port, timeout=timeout, extra_triggers=extra_triggers,
                         outputs=outputs)
-        # Note that the following attributes are not part of the NewportXPS class
-        
 
-    def show_status(self):
+    def connect(self):
+        """
+        Connect to the XPS controller and, if enabled, disable Nagle's algorithm
+        on the command socket so small command/reply pairs are not delayed.
+        Any socket from a previous connection is closed first so repeated
+        connects do not leak XPS sockets.
+        """
+        if self._sid is not None and self._sid >= 0:
+            self._xps.TCP_CloseSocket(self._sid)
+            self._sid = None
+        super().connect()
+        if self.tcp_nodelay:
+            self._xps.TCP_SetNoDelay(self._sid)
+
+    def reconnect(self):
+        """
+        Replace the current XPS session with a new one (login handshake included).
+        Only needed after the controller dropped the connection; otherwise the
+        session opened in __init__ is reused for every call.
+        """
+        self.clear_cache()
+        self.connect()
+
+    def show_status(self, force=False):
         """
         Show the status report of the motion controller.
+
+        The report takes several XPS queries, so one fetched less than
+        status_max_age seconds ago is reused unless force is True.
+
+        Inputs: force (bool): Whether to always fetch a new report. Default is False.
         """
-        return self.status_report()
+        now = time.monotonic()
+        if (force or self._status_cache is None
+                or now - self._status_ts >= self.status_max_age):
+            self._status_cache = self.status_report()
+            self._status_ts = now
+        return self._status_cache
 
     def initialize_and_home(self, home=True):
         """
@@ -38,18 +118,41 @@ class MotionController(NewportXPS):
                 self.initialize_group(group=g, home=home)
                 
             except XPSException:
-                print(f" '{g}' already initialized so will kill and reinitialize ")
+                logger.info("'%s' already initialized so will kill and reinitialize", g)
                 self.kill_group(group=g)
                 self.initialize_group(group=g)
                 self.home_group(group=g)
-        return self.status_report()
+        return self.show_status(force=True)
             
+    async def initialize_and_home_async(self, home=True):
+        """
+        Awaitable version of initialize_and_home for GUI callbacks.
+
+        The blocking XPS calls run in the event loop's default executor so the
+        UI stays responsive during the multi-second init/home sequence. The
+        sequence goes through run_async, so overlapping calls on the same
+        controller wait for each other instead of interleaving commands on the
+        single XPS socket.
+
+        Inputs: home (bool): Whether to home the stages after initialization. Default is True.
+        """
+        return await self.run_async(self.initialize_and_home, home)
+
     def stop_controller(self, group=None):
         """
         Stop the motion controller.
         """
         self.kill_group(group=group)
 
+    def clear_cache(self):
+        """
+        Forget the cached stage positions, velocities and status report so the
+        next read queries the XPS.
+        """
+        self._pos_cache.clear()
+        self._vel_cache.clear()
+        self._status_cache = None
+
     def set_position(self, stage: str, position: float, relative: bool = False):
         """
         Set the position of the specified stage.
@@ -58,12 +161,22 @@ class MotionController(NewportXPS):
             stage (str): The name of the stage.
             position (float): The target position.
             relative (bool): Whether the move is relative or absolute. Default is False.
+
+        An absolute move to within position_epsilon of the cached position is
+        not sent to the XPS.
         """
         # To extract the name of the stages (sname)
         # sname in self.stages.items()
-        
+
+        # Skip the move if the stage is already there. A cached position only
+        # exists if it was read after the last motion command, since every
+        # motion method clears the cache (see _clears_cache).
+        current = self._pos_cache.get(stage)
+        if not relative and current is not None and abs(position - current) < self.position_epsilon:
+            return current
+
         self.move_stage(stage, position, relative=relative)
-        return self.get_position(stage)
+        return self.get_position(stage, refresh=True)
 
     def set_velocity(self, stage: str, velocity: float):
         """
@@ -75,37 +188,71 @@ class MotionController(NewportXPS):
            
         """
         self.set_velocity_parameters(stage=stage, velo=velocity)
-        return self.get_velocity(stage)
+        return self.get_velocity(stage, refresh=True)
 
-    def get_position(self, stage: str):
+    def get_position(self, stage: str, refresh: bool = False):
         """Get the current position of the specified stage.
 
+        The position is cached after the first read and only re-queried after a
+        move through set_position, or when refresh is True.
+
         Args:
             stage (str): The name of the stage.
+            refresh (bool): Whether to bypass the cache and query the XPS. Default is False.
 
         Returns:
             float: The current position of the stage.
         """
+        position = self._pos_cache.get(stage)
+        if refresh or position is None:
+            position = self.get_stage_position(stage)
+            if position is not None:
+                self._pos_cache[stage] = position
+        logger.debug("The current position of %s is %s", stage, position)
+        return position
         
-        return print('The current position of',stage, 'is', self.get_stage_position(stage))
-        
-    def get_velocity(self, stage:str):
+    def get_velocity(self, stage:str, refresh: bool = False):
         """
         Get the current velocity of the specified stage.
 
+        The velocity is cached after the first read and only re-queried after
+        set_velocity, or when refresh is True.
+
         Args:
             stage (str): The name of the stage.
+            refresh (bool): Whether to bypass the cache and query the XPS. Default is False.
 
         Returns:
             float: The current velocity of the stage.
         """
         if stage not in self.stages:
-           print("Stage '%s' not found" % stage)
+           logger.warning("Stage '%s' not found", stage)
            return
-        ret, v_cur, a_cur, jt0_cur, jt1_cur = \
-             self._xps.PositionerSGammaParametersGet(self._sid, stage)    
-        return print('The current velocity of', stage, 'is', v_cur, 'Units/sec')
-    
+        v_cur = self._vel_cache.get(stage)
+        if refresh or v_cur is None:
+            ret, v_cur, a_cur, jt0_cur, jt1_cur = \
+                 self._xps.PositionerSGammaParametersGet(self._sid, stage)
+            self._vel_cache[stage] = v_cur
+        logger.debug("The current velocity of %s is %s Units/sec", stage, v_cur)
+        return v_cur
+
+    def get_all_velocities(self, stages=None, refresh: bool = False):
+        """
+        Get the current velocity of several stages.
+
+        Stages with a cached velocity are answered without touching the XPS;
+        only the remaining ones are queried.
+
+        Args:
+            stages (list): The names of the stages. Default is all stages.
+            refresh (bool): Whether to bypass the cache and query the XPS. Default is False.
+
+        Returns:
+            dict: The current velocity of each stage, keyed by stage name.
+        """
+        if stages is None:
+            stages = list(self.stages)
+        return {stage: self.get_velocity(stage, refresh=refresh) for stage in stages}
 
 
 if __name__ == "__main__":
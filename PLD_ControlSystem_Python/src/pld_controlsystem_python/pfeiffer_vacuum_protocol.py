@@ -1,4 +1,8 @@
+import random
+import time
 from enum import Enum
+from types import MappingProxyType
+from weakref import WeakKeyDictionary
 
 
 class InvalidCharError(Exception):
@@ -6,8 +10,64 @@ class InvalidCharError(Exception):
     pass
 
 
+class CorruptResponseError(ValueError):
+    """Gauge response garbled on the line (bad length, terminator or checksum)."""
+    pass
+
+
+class GaugeResponseMismatch(ValueError):
+    """Well-formed gauge response that answers a different request.
+
+    A different address means another device on the bus answered; a different
+    parameter number means the answer belongs to another request."""
+
+    def __init__(self, expected_addr, got_addr, expected_param, got_param):
+        if got_addr != expected_addr:
+            msg = "invalid response from gauge: address {} answered, expected {}".format(
+                got_addr, expected_addr)
+        else:
+            msg = "invalid response from gauge: parameter {} answered, expected {}".format(
+                got_param, expected_param)
+        super().__init__(msg)
+        self.expected_addr = expected_addr
+        self.got_addr = got_addr
+        self.expected_param = expected_param
+        self.got_param = got_param
+
+
 class PfeifferVacuumProtocol:
     _filter_invalid_char = False
+    # Extra attempts for a request whose answer arrives corrupted
+    max_retries = 2
+    # Encoded request telegrams, keyed by (addr, param_num[, data_str])
+    _req_cache = {}
+    # Gauge type codes (parameter 349) to model names
+    _GAUGE_TYPES = {
+        "    A1": "CPT 200",
+        "    A2": "RPT 200",
+        "    A3": "PPT 200",
+        "    A4": "HPT 200",
+        "    A5": "MPT 200",
+    }
+    # poll_many names -> (parameter number, decoder)
+    _POLL_PARAMS = {
+        "error_code": (303, "_decode_error_code"),
+        "software_version": (312, "_decode_software_version"),
+        "gauge_type": (349, "_decode_gauge_type"),
+        "pressure": (740, "_decode_pressure"),
+        "correction_value": (742, "_decode_correction_value"),
+    }
+    # Bytes dropped from responses when the valid character filter is enabled
+    _NON_ASCII = bytes(range(0x80, 0x100))
+    # Special data fields the gauge sends instead of a value
+    _DATA_ERRORS = {
+        b"NO_DEF": "undefined parameter number",
+        b"_RANGE": "data is out of range",
+        b"_LOGIC": "logic access violation",
+    }
+    # (addr, param_num, data) of unverified writes whose acknowledgments are
+    # not read back yet, per serial port
+    _pending_acks = WeakKeyDictionary()
 
     @classmethod
     def enable_valid_char_filter(cls):
@@ -29,19 +89,62 @@ class PfeifferVacuumProtocol:
         FILAMENT_2_DEFECTIVE = 6
         BOTH_FILAMENTS_DEFECTIVE = 7
 
-    @staticmethod
-    def _send_data_request(s, addr, param_num):
+    # Gauge error strings (parameter 303) to ErrorCode, built once at import
+    _ERROR_CODE_MAP = MappingProxyType({
+        "000000": ErrorCode.NO_ERROR,
+        "Wrn001": ErrorCode.FILAMENT_1_DEFECTIVE_IN_AUTO,
+        "Err001": ErrorCode.DEFECTIVE_GAUGE,
+        "Err002": ErrorCode.DEFECTIVE_MEMORY,
+        "Err003": ErrorCode.FILAMENT_1_DEFECTIVE,
+        "Err004": ErrorCode.FILAMENT_2_DEFECTIVE,
+        "Err005": ErrorCode.BOTH_FILAMENTS_DEFECTIVE,
+    })
+
+    @classmethod
+    def _data_request(cls, addr, param_num):
+        """Return the encoded data request telegram for a parameter."""
+        key = (addr, param_num)
+        buf = cls._req_cache.get(key)
+        if buf is None:
+            c = b"%03d00%03d02=?" % (addr, param_num)
+            buf = cls._req_cache[key] = c + b"%03d\r" % (sum(c) % 256)
+        return buf
+
+    @classmethod
+    def _send_data_request(cls, s, addr, param_num):
         """Send a data request to the gauge."""
-        c = "{:03d}00{:03d}02=?".format(addr, param_num)
-        c += "{:03d}\r".format(sum([ord(x) for x in c]) % 256)
-        s.write(c.encode())
+        s.write(cls._data_request(addr, param_num))
 
-    @staticmethod
-    def _send_control_command(s, addr, param_num, data_str):
+    @classmethod
+    def _send_control_command(cls, s, addr, param_num, data_str):
         """Send a control command to the gauge."""
-        c = "{:03d}10{:03d}{:02d}{:s}".format(addr, param_num, len(data_str), data_str)
-        c += "{:03d}\r".format(sum([ord(x) for x in c]) % 256)
-        return s.write(c.encode())
+        key = (addr, param_num, data_str)
+        buf = cls._req_cache.get(key)
+        if buf is None:
+            c = b"%03d10%03d%02d%s" % (addr, param_num, len(data_str), data_str.encode("ascii"))
+            buf = cls._req_cache[key] = c + b"%03d\r" % (sum(c) % 256)
+        return s.write(buf)
+
+    @staticmethod
+    def _read_frame(s):
+        """Read one raw telegram (up to and including the CR) from the port.
+
+        The header is fixed-width and carries the data length, so a clean
+        telegram takes two sized reads; pyserial's read_until would fetch it
+        one byte per call. If the header is not all digits, or the telegram does
+        not end where the header says (e.g. line noise), reading continues up to
+        the terminator instead."""
+        r = s.read(10)
+        if len(r) < 10:
+            return r  # timed out
+        # Trust the length field only if the whole header (AAA R 0 PPP LL) is
+        # digits; line noise shifts it and a sized read would then run into the
+        # next pipelined telegram
+        if r.isdigit():
+            r += s.read(int(r[8:10]) + 4)
+        if r[-1:] != b"\r" and len(r) < 64:
+            r += s.read_until(b"\r", 64 - len(r))
+        return r
 
     @classmethod
     def _read_gauge_response(cls, s, valid_char_filter=None):
@@ -49,141 +152,207 @@ class PfeifferVacuumProtocol:
         if valid_char_filter is None:
             valid_char_filter = cls._filter_invalid_char
 
-        r = ""
-        for _ in range(64):
-            c = s.read(1)
-            if c == b"":
-                break
-
-            try:
-                r += c.decode("ascii")
-            except UnicodeDecodeError:
-                if valid_char_filter:
-                    continue
+        r = cls._read_frame(s)
+        if not r.isascii():
+            if not valid_char_filter:
                 raise InvalidCharError(
                     "Cannot decode character. Enable the filter globally by running the function "
                     "`PfeifferVacuumProtocol.enable_valid_char_filter()`."
                 )
+            r = r.translate(None, cls._NON_ASCII)
 
-            if c == b"\r":
-                break
-
+        # Validate on the raw bytes; only the data field is decoded
+        if not r:
+            raise ValueError("no response from gauge (timed out)")
         if len(r) < 14:
-            raise ValueError("gauge response too short to be valid")
-        if r[-1] != "\r":
-            raise ValueError("gauge response incorrectly terminated")
-        if int(r[-4:-1]) != (sum([ord(x) for x in r[:-4]]) % 256):
-            raise ValueError("invalid checksum in gauge response")
+            raise CorruptResponseError("gauge response too short to be valid")
+        if r[-1] != 0x0D:
+            raise CorruptResponseError("gauge response incorrectly terminated")
+        if not r[-4:-1].isdigit() or int(r[-4:-1]) != (sum(r[:-4]) % 256):
+            raise CorruptResponseError("invalid checksum in gauge response")
 
+        # Fixed-width header: AAA R 0 PPP LL DATA CCC \r
         addr = int(r[:3])
-        rw = int(r[3:4])
+        rw = r[3] - 0x30  # single ASCII digit
         param_num = int(r[5:8])
         data = r[10:-4]
 
-        if data == "NO_DEF":
-            raise ValueError("undefined parameter number")
-        if data == "_RANGE":
-            raise ValueError("data is out of range")
-        if data == "_LOGIC":
-            raise ValueError("logic access violation")
+        error = cls._DATA_ERRORS.get(data)
+        if error is not None:
+            raise ValueError(error)
 
-        return addr, rw, param_num, data
+        return addr, rw, param_num, data.decode("ascii")
 
     @classmethod
-    def read_error_code(cls, s, addr, valid_char_filter=None):
-        """Read the error code from the gauge."""
-        cls._send_data_request(s, addr, 303)
-        raddr, rw, rparam_num, rdata = cls._read_gauge_response(s, valid_char_filter=valid_char_filter)
+    def flush_pending(cls, s, valid_char_filter=None):
+        """Read back and check the acknowledgments of earlier unverified writes.
+
+        Runs automatically before the next verified request on the port. All
+        outstanding answers are read even if one is wrong, so the port stays in
+        sync; the error for the first bad acknowledgment (ValueError, or
+        InvalidCharError for non-ASCII bytes) is then raised."""
+        error = None
+        read = cls._read_gauge_response
+        for addr, param_num, data in cls._pending_acks.pop(s, ()):
+            try:
+                raddr, rw, rparam_num, rdata = read(s, valid_char_filter=valid_char_filter)
+                if raddr != addr or rw != 1 or rparam_num != param_num or rdata != data:
+                    raise ValueError("invalid acknowledgment from gauge")
+            except (ValueError, InvalidCharError) as e:
+                if error is None:
+                    error = e
+        if error is not None:
+            raise error
 
-        if raddr != addr or rw != 1 or rparam_num != 303:
+    @classmethod
+    def _query(cls, s, addr, param_num, data_str=None, valid_char_filter=None, verify=True):
+        """Send a data request (or a control command if data_str is given) and
+        return the data field of the gauge's answer.
+
+        With verify=False the answer is not waited for and None is returned; the
+        outstanding answers are checked by flush_pending before the next
+        verified request on the same port, so back-to-back unverified writes
+        never block."""
+        if verify and s in cls._pending_acks:
+            cls.flush_pending(s, valid_char_filter=valid_char_filter)
+        send = cls._send_data_request if data_str is None else cls._send_control_command
+        args = (s, addr, param_num) if data_str is None else (s, addr, param_num, data_str)
+        send(*args)
+        if not verify:
+            cls._pending_acks.setdefault(s, []).append((addr, param_num, data_str))
+            return None
+
+        # A garbled answer (bad checksum or a non-ASCII byte from a flipped
+        # bit) is retried with exponential backoff and jitter; timeouts and
+        # errors reported by the gauge are raised at once.
+        for attempt in range(cls.max_retries + 1):
+            try:
+                raddr, rw, rparam_num, rdata = cls._read_gauge_response(s, valid_char_filter=valid_char_filter)
+                break
+            except (CorruptResponseError, InvalidCharError):
+                if attempt == cls.max_retries:
+                    raise
+                time.sleep(min(0.02 * 2 ** attempt, 0.1) + random.random() * 0.005)
+                s.reset_input_buffer()  # drop the rest of the garbled telegram
+                send(*args)
+
+        if raddr != addr or rparam_num != param_num:
+            raise GaugeResponseMismatch(addr, raddr, param_num, rparam_num)
+        if rw != 1:
             raise ValueError("invalid response from gauge")
 
-        if rdata == "000000":
-            return cls.ErrorCode.NO_ERROR
-        elif rdata == "Wrn001":
-            return cls.ErrorCode.FILAMENT_1_DEFECTIVE_IN_AUTO
-        elif rdata == "Err001":
-            return cls.ErrorCode.DEFECTIVE_GAUGE
-        elif rdata == "Err002":
-            return cls.ErrorCode.DEFECTIVE_MEMORY
-        elif rdata == "Err003":
-            return cls.ErrorCode.FILAMENT_1_DEFECTIVE
-        elif rdata == "Err004":
-            return cls.ErrorCode.FILAMENT_2_DEFECTIVE
-        elif rdata == "Err005":
-            return cls.ErrorCode.BOTH_FILAMENTS_DEFECTIVE
-        else:
-            raise ValueError("unexpected error code from gauge")
+        return rdata
 
     @classmethod
-    def read_software_version(cls, s, addr, valid_char_filter=None):
-        """Read the firmware version of the gauge."""
-        cls._send_data_request(s, addr, 312)
-        raddr, rw, rparam_num, rdata = cls._read_gauge_response(s, valid_char_filter=valid_char_filter)
+    def read_parameters(cls, s, addr, param_nums, valid_char_filter=None):
+        """Read several parameters in one pipelined transaction.
+
+        All data requests go out in a single write and the answers are read
+        back in order, so the cost is about one round trip instead of one per
+        parameter. Returns the raw data fields in the order of param_nums."""
+        param_nums = tuple(param_nums)
+        if s in cls._pending_acks:
+            cls.flush_pending(s, valid_char_filter=valid_char_filter)
+        request = cls._data_request
+        s.write(b"".join([request(addr, pn) for pn in param_nums]))
+
+        # Every answer is read even after a bad one, so the port stays in sync
+        read = cls._read_gauge_response
+        result = []
+        error = None
+        for param_num in param_nums:
+            try:
+                raddr, rw, rparam_num, rdata = read(s, valid_char_filter=valid_char_filter)
+                if raddr != addr or rparam_num != param_num:
+                    raise GaugeResponseMismatch(addr, raddr, param_num, rparam_num)
+                if rw != 1:
+                    raise ValueError("invalid response from gauge")
+            except (ValueError, InvalidCharError) as e:
+                if error is None:
+                    error = e
+                continue
+            result.append(rdata)
+        if error is not None:
+            raise error
+        return result
 
-        if raddr != addr or rw != 1 or rparam_num != 312:
-            raise ValueError("invalid response from gauge")
+    @classmethod
+    def _decode_error_code(cls, rdata):
+        ec = cls._ERROR_CODE_MAP.get(rdata)
+        if ec is None:
+            raise ValueError("unexpected error code from gauge")
+        return ec
 
+    @staticmethod
+    def _decode_software_version(rdata):
         return int(rdata[0:2]), int(rdata[2:4]), int(rdata[4:])
 
     @classmethod
-    def read_gauge_type(cls, s, addr, valid_char_filter=None):
-        """Read the gauge type."""
-        cls._send_data_request(s, addr, 349)
-        raddr, rw, rparam_num, rdata = cls._read_gauge_response(s, valid_char_filter=valid_char_filter)
+    def _decode_gauge_type(cls, rdata):
+        return cls._GAUGE_TYPES.get(rdata, "unrecognized gauge type")
 
-        if raddr != addr or rw != 1 or rparam_num != 349:
-            raise ValueError("invalid response from gauge")
+    @staticmethod
+    def _decode_pressure(rdata):
+        mantissa = int(rdata[:4])
+        exponent = int(rdata[4:])
+        return float(mantissa * 10 ** (exponent - 23))
 
-        gauge_types = {
-            "    A1": "CPT 200",
-            "    A2": "RPT 200",
-            "    A3": "PPT 200",
-            "    A4": "HPT 200",
-            "    A5": "MPT 200",
-        }
+    @staticmethod
+    def _decode_correction_value(rdata):
+        return int(rdata) / 100
+
+    @classmethod
+    def poll_many(cls, s, addr, names, valid_char_filter=None):
+        """Read several gauge values by name in one pipelined transaction.
 
-        return gauge_types.get(rdata, "unrecognized gauge type")
+        names are the reader names without the "read_" prefix, e.g.
+        ["pressure", "error_code"]. Returns a dict of the decoded values."""
+        names = tuple(names)
+        params = [cls._POLL_PARAMS[name] for name in names]
+        rdatas = cls.read_parameters(s, addr, [pn for pn, _ in params], valid_char_filter=valid_char_filter)
+        return {name: getattr(cls, decoder)(rdata)
+                for name, (_, decoder), rdata in zip(names, params, rdatas)}
 
     @classmethod
-    def read_pressure(cls, s, addr, valid_char_filter=None):
-        """Read the pressure from the gauge in bars."""
-        cls._send_data_request(s, addr, 740)
-        raddr, rw, rparam_num, rdata = cls._read_gauge_response(s, valid_char_filter=valid_char_filter)
+    def read_error_code(cls, s, addr, valid_char_filter=None):
+        """Read the error code from the gauge."""
+        return cls._decode_error_code(cls._query(s, addr, 303, valid_char_filter=valid_char_filter))
 
-        if raddr != addr or rw != 1 or rparam_num != 740:
-            raise ValueError("invalid response from gauge")
+    @classmethod
+    def read_software_version(cls, s, addr, valid_char_filter=None):
+        """Read the firmware version of the gauge."""
+        return cls._decode_software_version(cls._query(s, addr, 312, valid_char_filter=valid_char_filter))
 
-        mantissa = int(rdata[:4])
-        exponent = int(rdata[4:])
-        return float(mantissa * 10 ** (exponent - 23))
+    @classmethod
+    def read_gauge_type(cls, s, addr, valid_char_filter=None):
+        """Read the gauge type."""
+        return cls._decode_gauge_type(cls._query(s, addr, 349, valid_char_filter=valid_char_filter))
 
     @classmethod
-    def write_pressure_setpoint(cls, s, addr, val, valid_char_filter=None):
-        """Set the vacuum setpoint on the gauge."""
-        data = "{:03d}".format(val)
-        cls._send_control_command(s, addr, 741, data)
-        raddr, rw, rparam_num, rdata = cls._read_gauge_response(s, valid_char_filter=valid_char_filter)
+    def read_pressure(cls, s, addr, valid_char_filter=None):
+        """Read the pressure from the gauge in bars."""
+        return cls._decode_pressure(cls._query(s, addr, 740, valid_char_filter=valid_char_filter))
 
-        if raddr != addr or rw != 1 or rparam_num != 741:
-            raise ValueError("invalid response from gauge")
-        if rdata != data:
+    @classmethod
+    def write_pressure_setpoint(cls, s, addr, val, valid_char_filter=None, verify=True):
+        """Set the vacuum setpoint on the gauge.
+
+        With verify=False the acknowledgment is checked later, see flush_pending."""
+        data = "{:03d}".format(val)
+        rdata = cls._query(s, addr, 741, data, valid_char_filter=valid_char_filter, verify=verify)
+        if verify and rdata != data:
             raise ValueError("invalid acknowledgment from gauge")
 
     @classmethod
     def read_correction_value(cls, s, addr, valid_char_filter=None):
         """Read the current Pirani correction value used to adjust pressure measurements."""
-        cls._send_data_request(s, addr, 742)
-        raddr, rw, rparam_num, rdata = cls._read_gauge_response(s, valid_char_filter=valid_char_filter)
-
-        if raddr != addr or rw != 1 or rparam_num != 742:
-            raise ValueError("invalid response from gauge")
-
-        return float(rdata) / 100
+        return cls._decode_correction_value(cls._query(s, addr, 742, valid_char_filter=valid_char_filter))
 
     @classmethod
-    def write_correction_value(cls, s, addr, val, valid_char_filter=None):
-        """Set the Pirani correction value on the gauge."""
+    def write_correction_value(cls, s, addr, val, valid_char_filter=None, verify=True):
+        """Set the Pirani correction value on the gauge.
+
+        With verify=False the acknowledgment is checked later, see flush_pending."""
         # Check if the correction factor is within the valid range (0.2 to 0.8)
         if not (0.2 <= val <= 8.0):
             raise ValueError("Correction factor out of range. Must be between 0.2 and 0.8.")
@@ -191,12 +360,6 @@ class PfeifferVacuumProtocol:
         # Convert the correction value to an integer and format it as a 6-digit string
         data = "{:06d}".format(int(val * 100))
 
-        cls._send_control_command(s, addr, 742, data)
-       
-        # Read the gauge's response
-        raddr, rw, rparam_num, rdata = cls._read_gauge_response(s, valid_char_filter=valid_char_filter)
-
-        if raddr != addr or rw != 1 or rparam_num != 742:
-            raise ValueError("invalid response from gauge")
-        if rdata != data:
+        rdata = cls._query(s, addr, 742, data, valid_char_filter=valid_char_filter, verify=verify)
+        if verify and rdata != data:
             raise ValueError("invalid acknowledgment from gauge")
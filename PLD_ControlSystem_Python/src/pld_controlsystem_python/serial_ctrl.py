@@ -0,0 +1,96 @@
+import asyncio
+import functools
+
+import serial
+
+from pld_controlsystem_python.utils import configure_low_latency
+
+
+class AsyncMixin:
+    """
+    Adds run_async to a device class that talks over a single connection.
+    """
+    # (event loop, asyncio.Lock) pair; an asyncio.Lock only works in the loop
+    # it was first used in, so a new one is made when the running loop changes
+    _async_lock = (None, None)
+
+    async def run_async(self, method, *args, **kwargs):
+        """
+        Run one of the blocking device methods without stalling the event loop.
+
+        The call runs in the loop's default executor, so GUI callbacks can
+        await it directly, e.g.
+        ``await attenuator.run_async(attenuator.rotate_to_angle, 45)``.
+        Calls on the same device are serialized with a lock, since one
+        connection carries one command/response at a time and concurrent
+        callbacks must not interleave their bytes; calls on different
+        devices run concurrently.
+
+        :param method: The bound method to call.
+        :param args: Positional arguments passed to the method.
+        :param kwargs: Keyword arguments passed to the method.
+        """
+        loop = asyncio.get_running_loop()
+        lock_loop, lock = self._async_lock
+        if lock_loop is not loop:
+            lock = asyncio.Lock()
+            self._async_lock = (loop, lock)
+        async with lock:
+            return await loop.run_in_executor(None, functools.partial(method, *args, **kwargs))
+
+
+class SerialDevice(AsyncMixin):
+    """
+    Base for devices on a single serial port held in self.ser; closes the port
+    when used as a context manager.
+    """
+    def close(self):
+        """
+        Close the serial connection.
+        """
+        self.ser.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SerialControls(SerialDevice):
+    """
+    Base class for the serial-controlled microcontroller devices
+    (attenuator, target carousel). Holds the serial connection and the
+    write path shared by every device command.
+    """
+
+    def __init__(self, port, baudrate=9600, timeout=1):
+        """
+        Initialize the serial connection to the microcontroller.
+
+        :param port: The COM port to use for the serial connection.
+        :param baudrate: The baud rate for the serial communication.
+        :param timeout: The timeout for the serial communication.
+        """
+        self.ser = serial.Serial(port, baudrate, timeout=timeout)
+        configure_low_latency(self.ser)
+
+    def send_command(self, command):
+        """
+        Send a command to the microcontroller and read the response.
+
+        :param command: The command to send, as bytes (str is encoded first).
+        """
+        if isinstance(command, str):
+            command = command.encode()
+        self.ser.write(command)
+        # response = self.ser.readline().decode()
+        # print("Response:", response)
+
+    def send_many(self, commands):
+        """
+        Send several commands to the microcontroller in a single write.
+
+        :param commands: An iterable of command bytes, e.g. [b'o\\n', b'g\\n'].
+        """
+        self.ser.write(b''.join(commands))
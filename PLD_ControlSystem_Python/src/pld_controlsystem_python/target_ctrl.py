@@ -1,7 +1,10 @@
-import serial
-import time
+import logging
 
-class  TargetControls:
+from pld_controlsystem_python.serial_ctrl import SerialControls
+
+logger = logging.getLogger(__name__)
+
+class  TargetControls(SerialControls):
     """
     A class to with functions to control multi-target carousel controller for Neccera PLD System
     A pythonized version of preexisting Labview Multi-Target-Carousel-Controler VI code.
@@ -15,20 +18,9 @@ class  TargetControls:
         :param baudrate: The baud rate for the serial communication.
         :param timeout: The timeout for the serial communication.
         """
-        self.ser = serial.Serial(port, baudrate, timeout=timeout)
+        super().__init__(port, baudrate, timeout=timeout)
         self.current_target = 0
 
-    def send_command(self, command):
-        """
-        Send a command to the controller and read the response.
-
-        :param command: The command string to send.
-        """
-        self.ser.write(command.encode())
-        # response = self.ser.readline().decode()
-        # print("Response:", response)
-        time.sleep(0.01)  # Slight delay to ensure command is processed
-
     def rotate_to_angle(self, angle):
         """
         Rotate to a specified angle.
@@ -36,31 +28,27 @@ class  TargetControls:
         :param angle: The angle to rotate to.
         """
         #Convert possible float angle to nearest integer angle 
-        angle_int = round(angle)        
+        angle_int = round(angle)
 
-        command = f',{angle_int}\n'
-        self.send_command(command)
+        self.send_command(b',%d\n' % angle_int)
 
     def step_raster_cw(self):
         """
         Step the carousel in the clockwise direction.
         """
-        command = '>\n'
-        self.send_command(command)
+        self.send_command(b'>\n')
 
     def step_raster_ccw(self):
         """
         Step the carousel in the counter-clockwise direction.
         """
-        command = '<\n'
-        self.send_command(command)
+        self.send_command(b'<\n')
 
     def home_raster(self):
         """
         Home the carousel.
         """
-        command = 'o\n'
-        self.send_command(command)
+        self.send_command(b'o\n')
 
     def set_raster_speed(self,speed):
         """
@@ -71,37 +59,32 @@ class  TargetControls:
         """
         # Convert possible float speed to nearest integer speed
         speed_int = round(speed)
-        command = f"'{speed_int}\n"
-        self.send_command(command)
+        self.send_command(b"'%d\n" % speed_int)
 
     def start_raster(self, raster_angle):
         """
         Begin rastering. Enter raster angle(deg)
         """
         raster_angle_int = round(raster_angle)
-        command = f"s{raster_angle_int}\n"
-        self.send_command(command)
+        self.send_command(b"s%d\n" % raster_angle_int)
 
     def stop_raster(self):
         """
         Stop rastering.
         """
-        command = 'h\n'
-        self.send_command(command)
+        self.send_command(b'h\n')
 
     def start_rotate(self):
         """
         Start rotating the carousel.
         """
-        command = 'g\n'
-        self.send_command(command)
+        self.send_command(b'g\n')
 
     def stop_rotation(self):
         """
         Home the attenuator.
         """
-        command = 'r\n'
-        self.send_command(command)
+        self.send_command(b'r\n')
 
     def set_rotation_speed(self, speed):
         """
@@ -110,8 +93,7 @@ class  TargetControls:
         """
         # Convert possible float speed to nearest integer speed
         speed_int = round(speed)
-        command = f'#{speed_int}\n'
-        self.send_command(command)
+        self.send_command(b'#%d\n' % speed_int)
 
     def move_to_target(self, target):
         """
@@ -134,20 +116,15 @@ class  TargetControls:
         elif target == 6:
             target_serial = 314
         else:
-            print("Invalid target. Please enter a valid target.")
+            logger.warning("Invalid target %r. Please enter a valid target.", target)
             return
 
         self.current_target = target 
-        command = f"t{target_serial}\n"
-        self.send_command(command)
-
-    def close(self):
-        """
-        Close the serial connection.
-        """
-        self.ser.close()
+        self.send_command(b"t%d\n" % target_serial)
 
 def main():
+    logging.basicConfig(level=logging.INFO)
+
     # Create an instance of the AttenuatorControls class
     carousel = TargetControls()
 
@@ -1,3 +1,15 @@
+import array
+import os
+import sys
+
+try:
+    import fcntl
+    import termios
+except ImportError:  # Windows
+    fcntl = termios = None
+
+# serial_struct.flags bit from <linux/serial.h>
+ASYNC_LOW_LATENCY = 0x2000
 
 # it appears ftp really wants this encoding:
 ENCODING = 'latin-1'
@@ -31,3 +43,44 @@ def clean_text(text):
         line = line.replace('\r', '').replace('\n', '') + ' '
         buff.append(line)
     return '\n'.join(buff)
+
+def configure_low_latency(ser, buffer_size=65536):
+    """tune an open serial port for short request/response exchanges
+
+    On Windows the driver buffers are enlarged; on Linux the tty is put in
+    ASYNC_LOW_LATENCY mode so received bytes are pushed immediately instead
+    of waiting for the USB-serial latency timer (~16 ms). If the driver
+    rejects the ioctl, the FTDI latency_timer in sysfs is set to 1 ms instead.
+    Ports that support neither (pseudo-ttys, URL handlers) are left unchanged.
+    """
+    if sys.platform.startswith('win'):
+        ser.set_buffer_size(rx_size=buffer_size, tx_size=buffer_size)
+        return
+
+    fd = getattr(ser, 'fd', None)
+    if not isinstance(fd, int) or not hasattr(termios, 'TIOCGSERIAL'):
+        return
+    buf = array.array('i', [0] * 32)  # large enough for struct serial_struct
+    try:
+        fcntl.ioctl(fd, termios.TIOCGSERIAL, buf)
+        buf[4] |= ASYNC_LOW_LATENCY  # serial_struct.flags
+        fcntl.ioctl(fd, termios.TIOCSSERIAL, buf)
+    except OSError:
+        set_latency_timer(ser.port)
+
+def set_latency_timer(port, msec=1, sysfs_root='/sys/bus/usb-serial/devices'):
+    """set the USB-serial latency timer of a Linux tty (e.g. /dev/ttyUSB0)
+
+    Returns True if the timer was written, False if the port has none or it
+    is not writable.
+    """
+    if not port:
+        return False
+    name = os.path.basename(os.path.realpath(port))
+    path = os.path.join(sysfs_root, name, 'latency_timer')
+    try:
+        with open(path, 'w') as fh:
+            fh.write('%d' % msec)
+    except OSError:
+        return False
+    return True
@@ -1,7 +1,21 @@
+import asyncio
+import logging
+import time
+
 import serial
 from pld_controlsystem_python.pfeiffer_vacuum_protocol import PfeifferVacuumProtocol as pvp
+from pld_controlsystem_python.serial_ctrl import SerialDevice
+from pld_controlsystem_python.utils import configure_low_latency
+
+logger = logging.getLogger(__name__)
+
+# pressure_setpoint option -> gauge setpoint value
+_SETPOINT_OPTIONS = {'0': 0, '1': 1}
+
+class VacuumControls(SerialDevice):
+    # Seconds a pressure reading is reused by read_pressure before the gauge is queried again
+    pressure_max_age = 0.2
 
-class VacuumControls:
     def __init__(self, port='COM6', baudrate=9600, address=1):
         """
         Initializes the VacuumControls class with the specified serial port and baudrate.
@@ -12,23 +26,54 @@ class VacuumControls:
         address (int): The address of the device (default is 1).
         """
         self.ser = serial.Serial(port, baudrate, timeout=1)
+        configure_low_latency(self.ser)
         self.address = address
+        self._pressure_cache = None
+        self._pressure_ts = 0.0
+        self._gauge_info = None
     
-    def read_pressure(self):
+    def read_pressure(self, force=False):
         """
         Reads the actual pressure value from the device.
 
+        Several widgets polling the gauge in the same refresh share one serial
+        round trip: a reading younger than pressure_max_age seconds is reused
+        unless force is True.
+
+        Parameters:
+        force (bool): Whether to always query the gauge (default is False).
+
         Returns:
         tuple: A tuple containing the pressure in hPa (equivalent to mbar) and Torr (hPa, Torr).
                Returns (None, None) if no response is received.
         """
+        now = time.monotonic()
+        if (not force and self._pressure_cache is not None
+                and now - self._pressure_ts < self.pressure_max_age):
+            return self._pressure_cache
         try:
             pressure_hpa = pvp.read_pressure(self.ser, self.address)
             pressure_torr = pressure_hpa / 1.33322  # Convert hPa to Torr
-            return print(pressure_hpa, 'hPa', pressure_torr, 'Torr') # Return the pressure in hPa and Torr
+            logger.debug("Pressure: %s hPa, %s Torr", pressure_hpa, pressure_torr)
+            self._pressure_cache = pressure_hpa, pressure_torr
+            self._pressure_ts = now
+            return self._pressure_cache
         except ValueError:
             return None, None
 
+    async def read_pressure_async(self):
+        """
+        Awaitable version of read_pressure.
+
+        The blocking request/response runs in the event loop's default executor,
+        so a monitoring loop can keep several gauges (each on its own port) in
+        flight at once, see read_pressures.
+
+        Returns:
+        tuple: A tuple containing the pressure in hPa and Torr (hPa, Torr).
+        """
+        return await self.run_async(self.read_pressure)
+
 
  
     def read_error(self):
@@ -44,6 +89,45 @@ class VacuumControls:
             return error_code.name  # Return the name of the ErrorCode enum
         except ValueError:
             return None
+
+    def read_gauge_info(self):
+        """
+        Reads the gauge model and firmware version.
+
+        These cannot change while the port is open, so they are fetched once
+        (in a single request/response burst) and then returned from memory.
+
+        Returns:
+        dict: {'gauge_type': str, 'software_version': (int, int, int)}.
+              Returns None if no valid response is received.
+        """
+        if self._gauge_info is None:
+            try:
+                self._gauge_info = pvp.poll_many(self.ser, self.address,
+                                                 ("gauge_type", "software_version"))
+            except ValueError:
+                return None
+        return self._gauge_info
+
+    def read_status(self):
+        """
+        Reads the pressure and the error code in one request/response burst.
+
+        Both requests are sent in a single write and the answers read back in
+        order, so a monitoring loop pays one serial round trip instead of two.
+
+        Returns:
+        tuple: (pressure_hpa, pressure_torr, error_code_name).
+               Returns (None, None, None) if no valid response is received.
+        """
+        try:
+            values = pvp.poll_many(self.ser, self.address, ("pressure", "error_code"))
+        except ValueError:
+            return None, None, None
+        pressure_hpa = values["pressure"]
+        self._pressure_cache = pressure_hpa, pressure_hpa / 1.33322
+        self._pressure_ts = time.monotonic()
+        return self._pressure_cache + (values["error_code"].name,)
     
     def pressure_setpoint(self, option):
         """
@@ -59,11 +143,8 @@ class VacuumControls:
         Raises:
         ValueError: If an invalid option is provided.
         """
-        if option == '0':
-            val = 000
-        elif option == '1':
-            val = 1
-        else:
+        val = _SETPOINT_OPTIONS.get(option)
+        if val is None:
             raise ValueError("Invalid option. Use '0' or '1'.")
         
         try:
@@ -95,16 +176,35 @@ class VacuumControls:
             if 0.2 <= new_factor <= 8.0:
                 try:
                     pvp.write_correction_value(self.ser, self.address, new_factor)
+                    self.clear_cache()  # readings depend on the correction factor
                     return "Correction factor updated successfully."
                 except ValueError as e:
                     return str(e)
             else:
                 raise ValueError("Correction factor out of range. Must be between 0.2 and 8.0.")
 
+    def clear_cache(self):
+        """
+        Forgets the cached pressure reading so the next read queries the gauge.
+        """
+        self._pressure_cache = None
+
     def close(self):
         """
         Closes the serial connection.
         """
-        self.ser.close()
+        super().close()
+        self._gauge_info = None
+
+
+async def read_pressures(gauges):
+    """
+    Reads the pressure from several gauges concurrently.
 
+    Parameters:
+    gauges (iterable): VacuumControls instances, each with its own serial port.
 
+    Returns:
+    list: One (hPa, Torr) tuple per gauge, in the same order.
+    """
+    return await asyncio.gather(*(g.read_pressure_async() for g in gauges))
@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 from unittest.mock import MagicMock, patch
 import sys
@@ -10,7 +11,7 @@ from pld_controlsystem_python.attenuator_ctrl import AttenuatorControls
 
 class TestAttenuatorControls(unittest.TestCase):
 
-    @patch('pld_controlsystem_python.attenuator_ctrl.serial.Serial')  # Mocking the serial.Serial class in the attenuator_controls module
+    @patch('pld_controlsystem_python.serial_ctrl.serial.Serial')  # Mocking the serial.Serial class used by the shared SerialControls base
     def setUp(self, mock_serial):
         """
         Set up the AttenuatorControls instance and mock the serial connection.
@@ -34,6 +35,21 @@ class TestAttenuatorControls(unittest.TestCase):
         self.attenuator.send_command(command)
         self.mock_serial_instance.write.assert_called_with(command.encode())
 
+    def test_send_command_bytes(self):
+        """
+        Test the send_command method to ensure pre-encoded commands are sent as-is.
+        """
+        command = b'test_command\n'
+        self.attenuator.send_command(command)
+        self.mock_serial_instance.write.assert_called_with(command)
+
+    def test_send_many(self):
+        """
+        Test the send_many method to ensure the commands go out in one write.
+        """
+        self.attenuator.send_many([b'o\n', b'#5\n', b'g\n'])
+        self.mock_serial_instance.write.assert_called_once_with(b'o\n#5\ng\n')
+
     def test_rotate_to_angle(self):
         """
         Test the rotate_to_angle method to ensure it sends the correct command.
@@ -43,6 +59,13 @@ class TestAttenuatorControls(unittest.TestCase):
         expected_command = ',46\n'  # angle is rounded to the nearest integer
         self.mock_serial_instance.write.assert_called_with(expected_command.encode())
 
+    def test_rotate_to_negative_angle(self):
+        """
+        Test that negative angles are rounded to the nearest integer, not towards zero.
+        """
+        self.attenuator.rotate_to_angle(-1.2)
+        self.mock_serial_instance.write.assert_called_with(b',-1\n')
+
     def test_clear_laser(self):
         """
         Test the clear_laser method to ensure it sends the correct command.
@@ -73,6 +96,42 @@ class TestAttenuatorControls(unittest.TestCase):
         expected_command = '#5\n'  # speed is rounded to the nearest integer
         self.mock_serial_instance.write.assert_called_with(expected_command.encode())
 
+    def test_run_async(self):
+        """
+        Test the run_async method to ensure it runs the command off the event loop.
+        """
+        asyncio.run(self.attenuator.run_async(self.attenuator.rotate_to_angle, 90))
+        self.mock_serial_instance.write.assert_called_with(',90\n'.encode())
+
+    def test_run_async_serialized(self):
+        """
+        Test that concurrent run_async calls are issued one at a time, in order.
+        """
+        async def run_both():
+            await asyncio.gather(
+                self.attenuator.run_async(self.attenuator.home_attenuator),
+                self.attenuator.run_async(self.attenuator.block_laser),
+            )
+
+        asyncio.run(run_both())
+        writes = [c.args[0] for c in self.mock_serial_instance.write.call_args_list]
+        self.assertEqual(writes, [b'o\n', b'g\n'])
+
+    def test_run_async_two_loops(self):
+        """
+        Test that the same instance can run concurrent commands under two event loops.
+        """
+        async def run_both():
+            await asyncio.gather(
+                self.attenuator.run_async(self.attenuator.home_attenuator),
+                self.attenuator.run_async(self.attenuator.block_laser),
+            )
+
+        asyncio.run(run_both())
+        asyncio.run(run_both())
+        writes = [c.args[0] for c in self.mock_serial_instance.write.call_args_list]
+        self.assertEqual(writes, [b'o\n', b'g\n'] * 2)
+
     def test_close(self):
         """
         Test the close method to ensure it closes the serial connection.
@@ -0,0 +1,202 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import time
+import os
+
+# Add the src directory to the system path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from pld_controlsystem_python.motion_ctrl import MotionController
+
+class TestMotionController(unittest.TestCase):
+
+    @patch('pld_controlsystem_python.newportxps.NewportXPS.connect')  # No XPS on the network
+    @patch('pld_controlsystem_python.newportxps.XPS')  # Mocking the low-level XPS socket driver
+    def setUp(self, mock_xps, mock_connect):
+        """
+        Set up the MotionController instance with a mocked XPS driver.
+        """
+        self.mock_xps_instance = mock_xps.return_value  # This is the mock instance of XPS
+        self.controller = MotionController(host='192.168.254.254')
+        self.controller._sid = 0
+        self.controller.groups = {'Group1': {'category': 'SingleAxisInUse', 'positioners': ['Pos']}}
+        self.controller.stages = {'Group1.Pos': {'stagetype': 'ILS@ILS150CC@XPS-DRV11'}}
+
+    def test_tcp_nodelay(self):
+        """
+        Test that connecting disables Nagle's algorithm on the command socket.
+        """
+        self.mock_xps_instance.TCP_SetNoDelay.assert_called_once()
+
+    @patch('pld_controlsystem_python.newportxps.NewportXPS.connect')
+    @patch('pld_controlsystem_python.newportxps.XPS')
+    def test_tcp_nodelay_disabled(self, mock_xps, mock_connect):
+        """
+        Test that tcp_nodelay=False leaves the socket options untouched.
+        """
+        MotionController(host='192.168.254.254', tcp_nodelay=False)
+        mock_xps.return_value.TCP_SetNoDelay.assert_not_called()
+
+    @patch('pld_controlsystem_python.newportxps.NewportXPS.connect')
+    def test_reconnect_closes_old_socket(self, mock_connect):
+        """
+        Test that reconnect closes the previous socket before logging in again.
+        """
+        self.controller._pos_cache['Group1.Pos'] = 5.0
+        self.controller.reconnect()
+        self.mock_xps_instance.TCP_CloseSocket.assert_called_once_with(0)
+        mock_connect.assert_called_once()
+        self.assertEqual(self.controller._pos_cache, {})
+
+    def test_show_status_cached(self):
+        """
+        Test that show_status reuses a recent report unless forced.
+        """
+        self.controller.status_report = MagicMock(return_value='status')
+        self.assertEqual(self.controller.show_status(), 'status')
+        self.assertEqual(self.controller.show_status(), 'status')
+        self.controller.status_report.assert_called_once()
+
+        self.controller.show_status(force=True)
+        self.assertEqual(self.controller.status_report.call_count, 2)
+
+    def test_initialize_and_home_async(self):
+        """
+        Test that initialize_and_home_async initializes and homes every group.
+        """
+        self.mock_xps_instance.GroupInitializeWithEncoderCalibration.return_value = [0, '']
+        self.mock_xps_instance.GroupHomeSearch.return_value = [0, '']
+        self.controller.status_report = MagicMock(return_value='status')
+        result = asyncio.run(self.controller.initialize_and_home_async())
+        self.assertEqual(result, 'status')
+        self.mock_xps_instance.GroupInitializeWithEncoderCalibration.assert_called_once_with(0, 'Group1')
+        self.mock_xps_instance.GroupHomeSearch.assert_called_once_with(0, 'Group1')
+
+    def test_initialize_and_home_async_serialized(self):
+        """
+        Test that overlapping initialize_and_home_async calls run one after the other.
+        """
+        active = []
+        overlaps = []
+
+        def fake_initialize_and_home(home=True):
+            overlaps.append(bool(active))
+            active.append(home)
+            time.sleep(0.01)
+            active.pop()
+            return home
+
+        self.controller.initialize_and_home = fake_initialize_and_home
+
+        async def run_both():
+            return await asyncio.gather(
+                self.controller.initialize_and_home_async(),
+                self.controller.initialize_and_home_async(home=False),
+            )
+
+        self.assertEqual(asyncio.run(run_both()), [True, False])
+        self.assertEqual(overlaps, [False, False])
+
+    def test_get_position_cached(self):
+        """
+        Test that repeated get_position calls only query the XPS once.
+        """
+        self.mock_xps_instance.GroupPositionCurrentGet.return_value = [0, 5.0]
+        self.assertEqual(self.controller.get_position('Group1.Pos'), 5.0)
+        self.assertEqual(self.controller.get_position('Group1.Pos'), 5.0)
+        self.mock_xps_instance.GroupPositionCurrentGet.assert_called_once_with(0, 'Group1.Pos', 1)
+
+        self.controller.get_position('Group1.Pos', refresh=True)
+        self.assertEqual(self.mock_xps_instance.GroupPositionCurrentGet.call_count, 2)
+
+    def test_set_position_refreshes_cache(self):
+        """
+        Test that set_position re-reads the position after moving.
+        """
+        self.mock_xps_instance.GroupMoveAbsolute.return_value = [0, '']
+        self.mock_xps_instance.GroupPositionCurrentGet.return_value = [0, 5.0]
+        self.controller.get_position('Group1.Pos')
+        self.mock_xps_instance.GroupPositionCurrentGet.return_value = [0, 10.0]
+        self.assertEqual(self.controller.set_position('Group1.Pos', 10.0), 10.0)
+        self.mock_xps_instance.GroupMoveAbsolute.assert_called_once_with(0, 'Group1.Pos', [10.0])
+        self.assertEqual(self.controller._pos_cache['Group1.Pos'], 10.0)
+
+    def test_set_position_skips_noop_move(self):
+        """
+        Test that moving to the cached position does not send a move command.
+        """
+        self.controller._pos_cache['Group1.Pos'] = 5.0
+        self.assertEqual(self.controller.set_position('Group1.Pos', 5.0), 5.0)
+        self.mock_xps_instance.GroupMoveAbsolute.assert_not_called()
+
+    def test_inherited_move_clears_cache(self):
+        """
+        Test that moving through an inherited NewportXPS method drops the cached position.
+        """
+        self.mock_xps_instance.GroupMoveAbsolute.return_value = [0, '']
+        self.mock_xps_instance.GroupPositionCurrentGet.return_value = [0, 5.0]
+        self.assertEqual(self.controller.get_position('Group1.Pos'), 5.0)
+
+        self.controller.move_stage('Group1.Pos', 10.0)
+        self.mock_xps_instance.GroupPositionCurrentGet.return_value = [0, 10.0]
+        self.assertEqual(self.controller.get_position('Group1.Pos'), 10.0)
+
+    def test_failed_move_clears_cache(self):
+        """
+        Test that the cache is dropped even if the move reports an error.
+        """
+        self.controller._pos_cache['Group1.Pos'] = 5.0
+        self.mock_xps_instance.GroupMoveAbsolute.return_value = [-17, '']
+        self.mock_xps_instance.ErrorStringGet.return_value = [0, 'error']
+        with self.assertRaises(Exception):
+            self.controller.move_stage('Group1.Pos', 10.0)
+        self.assertEqual(self.controller._pos_cache, {})
+
+    def test_set_position_after_inherited_move(self):
+        """
+        Test that a stage moved through move_stage is moved back, not skipped
+        because of a position cached before that move.
+        """
+        self.mock_xps_instance.GroupMoveAbsolute.return_value = [0, '']
+        self.mock_xps_instance.GroupPositionCurrentGet.return_value = [0, 5.0]
+        self.controller.get_position('Group1.Pos')
+        self.controller.move_stage('Group1.Pos', 10.0)
+
+        self.controller.set_position('Group1.Pos', 5.0)
+        self.mock_xps_instance.GroupMoveAbsolute.assert_called_with(0, 'Group1.Pos', [5.0])
+        self.assertEqual(self.mock_xps_instance.GroupMoveAbsolute.call_count, 2)
+
+    def test_get_velocity_cached(self):
+        """
+        Test that repeated get_velocity calls only query the XPS once.
+        """
+        self.mock_xps_instance.PositionerSGammaParametersGet.return_value = [0, 20.0, 80.0, 0.02, 0.02]
+        self.assertEqual(self.controller.get_velocity('Group1.Pos'), 20.0)
+        self.assertEqual(self.controller.get_velocity('Group1.Pos'), 20.0)
+        self.mock_xps_instance.PositionerSGammaParametersGet.assert_called_once_with(0, 'Group1.Pos')
+
+    def test_get_all_velocities(self):
+        """
+        Test that get_all_velocities only queries stages without a cached velocity.
+        """
+        self.controller.stages['Group2.Pos'] = {'stagetype': 'ILS@ILS150CC@XPS-DRV11'}
+        self.controller._vel_cache['Group1.Pos'] = 20.0
+        self.mock_xps_instance.PositionerSGammaParametersGet.return_value = [0, 30.0, 80.0, 0.02, 0.02]
+        velocities = self.controller.get_all_velocities()
+        self.assertEqual(velocities, {'Group1.Pos': 20.0, 'Group2.Pos': 30.0})
+        self.mock_xps_instance.PositionerSGammaParametersGet.assert_called_once_with(0, 'Group2.Pos')
+
+    def test_stop_controller_clears_cache(self):
+        """
+        Test that stopping the controller forgets the cached positions.
+        """
+        self.mock_xps_instance.GroupKill.return_value = [0, '']
+        self.controller._pos_cache['Group1.Pos'] = 5.0
+        self.controller.stop_controller()
+        self.mock_xps_instance.GroupKill.assert_called_once_with(0, 'Group1')
+        self.assertEqual(self.controller._pos_cache, {})
+
+if __name__ == '__main__':
+    unittest.main()
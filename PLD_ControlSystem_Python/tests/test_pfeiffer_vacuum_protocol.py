@@ -0,0 +1,319 @@
+import unittest
+import sys
+import os
+
+# Add the src directory to the system path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from pld_controlsystem_python.pfeiffer_vacuum_protocol import PfeifferVacuumProtocol as pvp
+from pld_controlsystem_python.pfeiffer_vacuum_protocol import InvalidCharError, CorruptResponseError, GaugeResponseMismatch
+from unittest.mock import patch
+
+
+def frame(body):
+    """Append the Pfeiffer checksum and terminator to a telegram body."""
+    return (body + "{:03d}\r".format(sum(body.encode()) % 256)).encode()
+
+
+class FakeSerial:
+    """Minimal stand-in for serial.Serial that replays canned gauge responses."""
+
+    def __init__(self, response=b""):
+        self.rx = bytearray(response)
+        self.written = []
+
+    def write(self, data):
+        self.written.append(bytes(data))
+        return len(data)
+
+    def read(self, size=1):
+        data = bytes(self.rx[:size])
+        del self.rx[:size]
+        return data
+
+    def read_until(self, expected=b"\n", size=None):
+        end = self.rx.find(expected)
+        end = len(self.rx) if end < 0 else end + len(expected)
+        if size is not None:
+            end = min(end, size)
+        return self.read(end)
+
+    @property
+    def in_waiting(self):
+        return len(self.rx)
+
+    def reset_input_buffer(self):
+        self.rx.clear()
+
+
+class TestPfeifferVacuumProtocol(unittest.TestCase):
+
+    def test_send_data_request(self):
+        """
+        Test that a data request is encoded with the correct checksum.
+        """
+        s = FakeSerial()
+        pvp._send_data_request(s, 1, 740)
+        self.assertEqual(s.written, [frame("0010074002=?")])
+
+    def test_data_request_cached(self):
+        """
+        Test that the encoded request is built once and reused.
+        """
+        s = FakeSerial()
+        pvp._send_data_request(s, 2, 740)
+        pvp._send_data_request(s, 2, 740)
+        self.assertIs(s.written[0], s.written[1])
+
+    def test_send_control_command(self):
+        """
+        Test that a control command is encoded with the correct checksum.
+        """
+        s = FakeSerial()
+        pvp._send_control_command(s, 1, 741, "001")
+        self.assertEqual(s.written, [frame("0011074103001")])
+
+    def test_read_parameters(self):
+        """
+        Test that several requests go out in one write and the answers are
+        returned in order.
+        """
+        s = FakeSerial(frame("0011074006100023") + frame("0011030306000000"))
+        self.assertEqual(pvp.read_parameters(s, 1, [740, 303]), ["100023", "000000"])
+        self.assertEqual(s.written, [frame("0010074002=?") + frame("0010030302=?")])
+
+    def test_poll_many(self):
+        """
+        Test that named values are read in one transaction and decoded.
+        """
+        s = FakeSerial(frame("0011074006100023") + frame("0011030306Err002"))
+        self.assertEqual(
+            pvp.poll_many(s, 1, ["pressure", "error_code"]),
+            {"pressure": 1000.0, "error_code": pvp.ErrorCode.DEFECTIVE_MEMORY},
+        )
+        self.assertEqual(len(s.written), 1)
+
+    def test_read_pressure(self):
+        """
+        Test that the pressure is decoded from mantissa and exponent.
+        """
+        s = FakeSerial(frame("0011074006100023"))
+        self.assertEqual(pvp.read_pressure(s, 1), 1000.0)
+        self.assertEqual(s.written, [frame("0010074002=?")])
+
+    def test_read_error_code(self):
+        """
+        Test that error codes are mapped to the ErrorCode enum.
+        """
+        s = FakeSerial(frame("0011030306Err002"))
+        self.assertEqual(pvp.read_error_code(s, 1), pvp.ErrorCode.DEFECTIVE_MEMORY)
+
+        s = FakeSerial(frame("0011030306Err999"))
+        with self.assertRaises(ValueError):
+            pvp.read_error_code(s, 1)
+
+    def test_read_gauge_type(self):
+        """
+        Test that the gauge type code is translated to a model name.
+        """
+        s = FakeSerial(frame("0011034906    A2"))
+        self.assertEqual(pvp.read_gauge_type(s, 1), "RPT 200")
+
+    def test_read_software_version(self):
+        """
+        Test that the firmware version is split into its three fields.
+        """
+        s = FakeSerial(frame("0011031206010203"))
+        self.assertEqual(pvp.read_software_version(s, 1), (1, 2, 3))
+
+    def test_write_pressure_setpoint(self):
+        """
+        Test that the setpoint is sent and its acknowledgment checked.
+        """
+        s = FakeSerial(frame("0011074103001"))
+        pvp.write_pressure_setpoint(s, 1, 1)
+        self.assertEqual(s.written, [frame("0011074103001")])
+
+        s = FakeSerial(frame("0011074103000"))
+        with self.assertRaises(ValueError):
+            pvp.write_pressure_setpoint(s, 1, 1)
+
+    def test_write_without_verify(self):
+        """
+        Test that an unverified write returns at once and its acknowledgment
+        is checked before the next request.
+        """
+        s = FakeSerial()
+        pvp.write_pressure_setpoint(s, 1, 1, verify=False)
+        pvp.write_correction_value(s, 1, 2.0, verify=False)
+        self.assertEqual(s.written, [frame("0011074103001"), frame("0011074206000200")])
+
+        s.rx += frame("0011074103001") + frame("0011074206000200") + frame("0011074006100023")
+        self.assertEqual(pvp.read_pressure(s, 1), 1000.0)
+        self.assertEqual(s.in_waiting, 0)
+
+    def test_flush_pending(self):
+        """
+        Test that deferred acknowledgments are checked and a bad one is reported
+        after all of them have been read.
+        """
+        s = FakeSerial()
+        pvp.write_pressure_setpoint(s, 1, 1, verify=False)
+        pvp.write_pressure_setpoint(s, 1, 0, verify=False)
+
+        s.rx += frame("0011074103000") + frame("0011074103000")
+        with self.assertRaises(ValueError):
+            pvp.flush_pending(s)
+        self.assertEqual(s.in_waiting, 0)
+        pvp.flush_pending(s)  # nothing left to check
+
+    def test_flush_pending_invalid_char(self):
+        """
+        Test that a non-ASCII acknowledgment does not leave the later ones unread.
+        """
+        s = FakeSerial()
+        pvp.write_pressure_setpoint(s, 1, 1, verify=False)
+        pvp.write_pressure_setpoint(s, 1, 0, verify=False)
+
+        s.rx += b"\xff" + frame("0011074103001") + frame("0011074103000")
+        with self.assertRaises(InvalidCharError):
+            pvp.flush_pending(s)
+        self.assertEqual(s.in_waiting, 0)
+
+        s.rx += frame("0011074006100023")
+        self.assertEqual(pvp.read_pressure(s, 1), 1000.0)
+
+    def test_correction_value(self):
+        """
+        Test reading and writing the Pirani correction value.
+        """
+        s = FakeSerial(frame("0011074206000100"))
+        self.assertEqual(pvp.read_correction_value(s, 1), 1.0)
+
+        s = FakeSerial(frame("0011074206000200"))
+        pvp.write_correction_value(s, 1, 2.0)
+        self.assertEqual(s.written, [frame("0011074206000200")])
+
+        with self.assertRaises(ValueError):
+            pvp.write_correction_value(s, 1, 9.0)
+
+    def test_read_frame_sized(self):
+        """
+        Test that a clean telegram is read with sized reads, not read_until.
+        """
+        s = FakeSerial(frame("0011074006100023"))
+        s.read_until = None
+        self.assertEqual(pvp._read_frame(s), frame("0011074006100023"))
+
+    def test_no_response(self):
+        """
+        Test that a silent gauge is reported as a timeout.
+        """
+        with self.assertRaisesRegex(ValueError, "timed out"):
+            pvp.read_pressure(FakeSerial(), 1)
+
+    def test_invalid_checksum(self):
+        """
+        Test that a corrupted checksum is rejected.
+        """
+        s = FakeSerial(b"0011074006100023000\r")
+        with self.assertRaises(ValueError):
+            pvp.read_pressure(s, 1)
+
+    @patch('pld_controlsystem_python.pfeiffer_vacuum_protocol.time.sleep')
+    def test_retry_corrupt_response(self, mock_sleep):
+        """
+        Test that a garbled answer is re-requested, up to max_retries times.
+        """
+        s = FakeSerial(b"0011074006100023000\r")
+        s.reset_input_buffer = lambda: s.rx.extend(frame("0011074006100023"))
+        self.assertEqual(pvp.read_pressure(s, 1), 1000.0)
+        self.assertEqual(len(s.written), 2)
+
+        s = FakeSerial(b"0011074006100023000\r")
+        s.reset_input_buffer = lambda: s.rx.extend(b"0011074006100023000\r")
+        with self.assertRaises(CorruptResponseError):
+            pvp.read_pressure(s, 1)
+        self.assertEqual(len(s.written), pvp.max_retries + 1)
+
+    @patch('pld_controlsystem_python.pfeiffer_vacuum_protocol.time.sleep')
+    def test_retry_invalid_char(self, mock_sleep):
+        """
+        Test that an answer with a non-ASCII byte is re-requested like a garbled one.
+        """
+        s = FakeSerial(b"\xff" + frame("0011074006100023"))
+        s.reset_input_buffer = lambda: s.rx.extend(frame("0011074006100023"))
+        self.assertEqual(pvp.read_pressure(s, 1), 1000.0)
+        self.assertEqual(len(s.written), 2)
+
+    def test_response_from_wrong_address(self):
+        """
+        Test that a response from another gauge is rejected.
+        """
+        s = FakeSerial(frame("0021074006100023"))
+        with self.assertRaises(GaugeResponseMismatch) as cm:
+            pvp.read_pressure(s, 1)
+        self.assertEqual((cm.exception.expected_addr, cm.exception.got_addr), (1, 2))
+
+    def test_read_parameters_mismatch(self):
+        """
+        Test that a wrong answer in a batch is reported after all answers are read.
+        """
+        s = FakeSerial(frame("0011074206000100") + frame("0011030306000000"))
+        with self.assertRaises(GaugeResponseMismatch) as cm:
+            pvp.read_parameters(s, 1, [740, 303])
+        self.assertEqual((cm.exception.expected_param, cm.exception.got_param), (740, 742))
+        self.assertEqual(s.in_waiting, 0)
+
+    def test_read_parameters_invalid_char(self):
+        """
+        Test that a non-ASCII answer in a batch is reported after all answers are read.
+        """
+        s = FakeSerial(b"\xff" + frame("0011074006100023") + frame("0011030306000000"))
+        with self.assertRaises(InvalidCharError):
+            pvp.read_parameters(s, 1, [740, 303])
+        self.assertEqual(s.in_waiting, 0)
+
+    def test_gauge_error_response(self):
+        """
+        Test that the gauge's special error data fields raise ValueError.
+        """
+        s = FakeSerial(frame("0011074006NO_DEF"))
+        with self.assertRaisesRegex(ValueError, "undefined parameter"):
+            pvp.read_pressure(s, 1)
+
+    @patch('pld_controlsystem_python.pfeiffer_vacuum_protocol.time.sleep')
+    def test_invalid_char(self, mock_sleep):
+        """
+        Test non-ASCII bytes raise, after the retries, unless the valid character filter is enabled.
+        """
+        response = frame("0011074006100023")
+        noisy = b"\xff" + response
+
+        s = FakeSerial(noisy)
+        s.reset_input_buffer = lambda: s.rx.extend(noisy)
+        with self.assertRaises(InvalidCharError):
+            pvp.read_pressure(s, 1)
+        self.assertEqual(len(s.written), pvp.max_retries + 1)
+
+        pvp.enable_valid_char_filter()
+        try:
+            self.assertEqual(pvp.read_pressure(FakeSerial(noisy), 1), 1000.0)
+        finally:
+            pvp.disable_valid_char_filter()
+
+    def test_invalid_char_pipelined(self):
+        """
+        Test that leading noise does not make a pipelined read consume the next telegram.
+        """
+        a = frame("0011074006100023")
+        b = frame("0011030306000000")
+        pvp.enable_valid_char_filter()
+        try:
+            s = FakeSerial(b"\xff\xff" + a + b)
+            self.assertEqual(pvp.read_parameters(s, 1, [740, 303]), ["100023", "000000"])
+        finally:
+            pvp.disable_valid_char_filter()
+
+if __name__ == '__main__':
+    unittest.main()
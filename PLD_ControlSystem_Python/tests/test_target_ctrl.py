@@ -10,7 +10,7 @@ from pld_controlsystem_python.target_ctrl import TargetControls  # adjust the im
 
 class TestTargetControls(unittest.TestCase):
 
-    @patch('pld_controlsystem_python.target_ctrl.serial.Serial')  # Mocking the serial.Serial class in the module
+    @patch('pld_controlsystem_python.serial_ctrl.serial.Serial')  # Mocking the serial.Serial class used by the shared SerialControls base
     def setUp(self, mock_serial):
         """
         Set up the TargetControls instance and mock the serial connection.
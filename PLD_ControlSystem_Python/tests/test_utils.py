@@ -0,0 +1,105 @@
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add the src directory to the system path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from pld_controlsystem_python import utils
+
+
+class TestConfigureLowLatency(unittest.TestCase):
+
+    @patch('pld_controlsystem_python.utils.sys.platform', 'win32')
+    def test_windows_sets_buffer_size(self):
+        """
+        Test that on Windows the driver buffers are enlarged and no ioctl is made.
+        """
+        ser = MagicMock()
+        with patch('pld_controlsystem_python.utils.fcntl') as mock_fcntl:
+            utils.configure_low_latency(ser, buffer_size=4096)
+        ser.set_buffer_size.assert_called_once_with(rx_size=4096, tx_size=4096)
+        mock_fcntl.ioctl.assert_not_called()
+
+    @patch('pld_controlsystem_python.utils.sys.platform', 'linux')
+    @patch('pld_controlsystem_python.utils.termios')
+    @patch('pld_controlsystem_python.utils.fcntl')
+    def test_linux_sets_low_latency_flag(self, mock_fcntl, mock_termios):
+        """
+        Test that on Linux ASYNC_LOW_LATENCY is set in serial_struct.flags.
+        """
+        flags = []
+        mock_fcntl.ioctl.side_effect = lambda fd, req, buf: flags.append(buf[4])
+        ser = MagicMock(fd=3)
+
+        utils.configure_low_latency(ser)
+
+        self.assertEqual(
+            [c.args[:2] for c in mock_fcntl.ioctl.call_args_list],
+            [(3, mock_termios.TIOCGSERIAL), (3, mock_termios.TIOCSSERIAL)],
+        )
+        self.assertEqual(flags, [0, utils.ASYNC_LOW_LATENCY])
+        ser.set_buffer_size.assert_not_called()
+
+    @patch('pld_controlsystem_python.utils.sys.platform', 'linux')
+    @patch('pld_controlsystem_python.utils.termios')
+    @patch('pld_controlsystem_python.utils.fcntl')
+    def test_linux_skips_port_without_fd(self, mock_fcntl, mock_termios):
+        """
+        Test that ports without a file descriptor (URL handlers) are left unchanged.
+        """
+        utils.configure_low_latency(MagicMock(fd=None))
+        mock_fcntl.ioctl.assert_not_called()
+
+    @patch('pld_controlsystem_python.utils.set_latency_timer')
+    @patch('pld_controlsystem_python.utils.sys.platform', 'linux')
+    @patch('pld_controlsystem_python.utils.termios')
+    @patch('pld_controlsystem_python.utils.fcntl')
+    def test_linux_falls_back_to_latency_timer(self, mock_fcntl, mock_termios, mock_set_latency_timer):
+        """
+        Test that the sysfs latency timer is used when TIOCSSERIAL is rejected.
+        """
+        mock_fcntl.ioctl.side_effect = OSError
+        ser = MagicMock(fd=3, port='/dev/ttyUSB0')
+
+        utils.configure_low_latency(ser)
+
+        mock_set_latency_timer.assert_called_once_with('/dev/ttyUSB0')
+
+    @patch('pld_controlsystem_python.utils.sys.platform', 'linux')
+    @patch('pld_controlsystem_python.utils.termios')
+    @patch('pld_controlsystem_python.utils.fcntl')
+    def test_linux_no_fallback_on_success(self, mock_fcntl, mock_termios):
+        """
+        Test that the sysfs latency timer is left alone when the ioctl succeeds.
+        """
+        with patch('pld_controlsystem_python.utils.set_latency_timer') as mock_set_latency_timer:
+            utils.configure_low_latency(MagicMock(fd=3))
+        mock_set_latency_timer.assert_not_called()
+
+
+class TestSetLatencyTimer(unittest.TestCase):
+
+    def test_writes_latency_timer(self):
+        """
+        Test that the timer is written for a port with a sysfs entry.
+        """
+        with tempfile.TemporaryDirectory() as root:
+            os.mkdir(os.path.join(root, 'ttyUSB0'))
+            self.assertTrue(utils.set_latency_timer('/dev/ttyUSB0', 1, sysfs_root=root))
+            with open(os.path.join(root, 'ttyUSB0', 'latency_timer')) as fh:
+                self.assertEqual(fh.read(), '1')
+
+    def test_port_without_latency_timer(self):
+        """
+        Test that False is returned for a port without a sysfs entry, or no port.
+        """
+        with tempfile.TemporaryDirectory() as root:
+            self.assertFalse(utils.set_latency_timer('/dev/ttyS0', sysfs_root=root))
+        self.assertFalse(utils.set_latency_timer(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 from unittest.mock import patch, MagicMock
 import serial
@@ -7,7 +8,7 @@ import os
 # Add the src directory to the system path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from pld_controlsystem_python.vacuum_ctrl import VacuumControls
+from pld_controlsystem_python.vacuum_ctrl import VacuumControls, read_pressures
 
 class TestVacuumControls(unittest.TestCase):
 
@@ -28,6 +29,41 @@ class TestVacuumControls(unittest.TestCase):
         self.assertEqual(pressure_torr, 1000.0 / 1.33322)
         mock_read_pressure.assert_called_once_with(self.mock_serial_instance, 1)
 
+    @patch('pld_controlsystem_python.vacuum_ctrl.pvp.read_pressure')
+    def test_read_pressure_cached(self, mock_read_pressure):
+        mock_read_pressure.return_value = 1000.0
+
+        first = self.vacuum.read_pressure()
+        self.assertEqual(self.vacuum.read_pressure(), first)
+        mock_read_pressure.assert_called_once()
+
+        self.vacuum.read_pressure(force=True)
+        self.assertEqual(mock_read_pressure.call_count, 2)
+
+        self.vacuum.clear_cache()
+        self.vacuum.read_pressure()
+        self.assertEqual(mock_read_pressure.call_count, 3)
+
+    @patch('pld_controlsystem_python.vacuum_ctrl.pvp.read_pressure')
+    def test_read_pressures(self, mock_read_pressure):
+        mock_read_pressure.return_value = 1000.0
+        with patch('pld_controlsystem_python.vacuum_ctrl.serial.Serial'):
+            other = VacuumControls(port='COM8', address=2)
+
+        results = asyncio.run(read_pressures([self.vacuum, other]))
+
+        self.assertEqual(results, [(1000.0, 1000.0 / 1.33322)] * 2)
+        self.assertEqual(mock_read_pressure.call_count, 2)
+
+    @patch('pld_controlsystem_python.vacuum_ctrl.pvp.read_correction_value')
+    def test_run_async(self, mock_read_correction_value):
+        mock_read_correction_value.return_value = 1.0
+
+        result = asyncio.run(self.vacuum.run_async(self.vacuum.correction_factor))
+
+        self.assertEqual(result, 1.0)
+        mock_read_correction_value.assert_called_once_with(self.mock_serial_instance, 1)
+
     @patch('pld_controlsystem_python.vacuum_ctrl.pvp.read_error_code')
     def test_read_error(self, mock_read_error_code):
         # Mocking the return value of read_error_code function
@@ -38,18 +74,37 @@ class TestVacuumControls(unittest.TestCase):
         self.assertEqual(error, 'NO_ERROR')
         mock_read_error_code.assert_called_once_with(self.mock_serial_instance, 1)
 
+    @patch('pld_controlsystem_python.vacuum_ctrl.pvp.poll_many')
+    def test_read_status(self, mock_poll_many):
+        mock_poll_many.return_value = {"pressure": 1000.0, "error_code": MagicMock()}
+        mock_poll_many.return_value["error_code"].name = 'NO_ERROR'
+
+        status = self.vacuum.read_status()
+
+        self.assertEqual(status, (1000.0, 1000.0 / 1.33322, 'NO_ERROR'))
+        mock_poll_many.assert_called_once_with(self.mock_serial_instance, 1, ("pressure", "error_code"))
+
+    @patch('pld_controlsystem_python.vacuum_ctrl.pvp.poll_many')
+    def test_read_gauge_info(self, mock_poll_many):
+        mock_poll_many.return_value = {"gauge_type": "RPT 200", "software_version": (1, 2, 3)}
+
+        self.assertEqual(self.vacuum.read_gauge_info(), mock_poll_many.return_value)
+        self.vacuum.read_gauge_info()
+        mock_poll_many.assert_called_once_with(self.mock_serial_instance, 1, ("gauge_type", "software_version"))
+
     @patch('pld_controlsystem_python.vacuum_ctrl.pvp.write_pressure_setpoint')
     def test_set_pressure(self, mock_write_pressure_setpoint):
-        response = self.vacuum.set_pressure('0')
+        response = self.vacuum.pressure_setpoint('0')
         self.assertEqual(response, "Pressure setpoint updated successfully.")
-        mock_write_pressure_setpoint.assert_called_once_with(self.mock_serial_instance, 1, 1e-5)
+        mock_write_pressure_setpoint.assert_called_once_with(self.mock_serial_instance, 1, 0)
 
-        response = self.vacuum.set_pressure('1')
+        response = self.vacuum.pressure_setpoint('1')
         self.assertEqual(response, "Pressure setpoint updated successfully.")
-        mock_write_pressure_setpoint.assert_called_with(self.mock_serial_instance, 1, 2050)
+        mock_write_pressure_setpoint.assert_called_with(self.mock_serial_instance, 1, 1)
 
         with self.assertRaises(ValueError):
-            self.vacuum.set_pressure('2')
+            self.vacuum.pressure_setpoint('2')
+        self.assertEqual(mock_write_pressure_setpoint.call_count, 2)
 
     @patch('pld_controlsystem_python.vacuum_ctrl.pvp.read_correction_value')
     def test_correction_factor_read(self, mock_read_correction_value):
@@ -76,6 +131,11 @@ class TestVacuumControls(unittest.TestCase):
         self.vacuum.close()
         self.mock_serial_instance.close.assert_called_once()
 
+    def test_context_manager(self):
+        with self.vacuum as vacuum:
+            self.assertIs(vacuum, self.vacuum)
+        self.mock_serial_instance.close.assert_called_once()
+
 
 if __name__ == '__main__':
     unittest.main()